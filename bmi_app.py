@@ -1,127 +1,323 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 from typing import List, Dict, Tuple
 import hashlib
+import hmac
+import os
+import functools
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+DB_PATH = 'bmi_data.db'
+CATEGORIES = ('Underweight', 'Normal weight', 'Overweight', 'Obese')
+# Lower bounds of every category after the first
+BMI_THRESHOLDS = np.array([18.5, 25.0, 30.0])
+# Same thresholds as Python floats for the scalar path
+_UNDERWEIGHT_MAX, _NORMAL_MAX, _OVERWEIGHT_MAX = BMI_THRESHOLDS.tolist()
+
+# Hot-path SQL kept as constants so the connection's statement cache reuses them
+SELECT_AUTH_SQL = 'SELECT id, password_hash FROM users WHERE username = ?'
+INSERT_RECORD_SQL = '''
+    INSERT INTO bmi_records (user_id, weight, height, bmi, category)
+    VALUES (?, ?, ?, ?, ?)
+'''
+SELECT_HISTORY_SQL = '''
+    SELECT weight, height, bmi, category, recorded_at
+    FROM bmi_records
+    WHERE user_id = ?
+    ORDER BY recorded_at DESC, id DESC
+    LIMIT ?
+'''
+# connectorx cannot bind parameters; fields are formatted as integers only
+CX_HISTORY_SQL_TEMPLATE = '''
+    SELECT weight, height, bmi, category, recorded_at
+    FROM bmi_records
+    WHERE user_id = {user_id:d}
+    ORDER BY recorded_at DESC, id DESC
+    LIMIT {limit:d}
+'''
+SELECT_CATEGORY_COUNTS_SQL = '''
+    SELECT category, COUNT(*)
+    FROM bmi_records
+    WHERE user_id = ?
+    GROUP BY category
+'''
+# Changes whenever a record is added for the user; used as the history cache key
+SELECT_HISTORY_VERSION_SQL = 'SELECT COUNT(*), MAX(id) FROM bmi_records WHERE user_id = ?'
 
 # Database setup
+@st.cache_resource
+def get_conn() -> sqlite3.Connection:
+    """Open a single shared SQLite connection tuned for WAL mode"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False,
+                           isolation_level=None, cached_statements=256)
+    conn.executescript('''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-20000;
+    ''')
+    return conn
+
+@st.cache_resource
+def get_ro_conn() -> sqlite3.Connection:
+    """Open a read-only connection for history and statistics queries"""
+    conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True, check_same_thread=False,
+                           cached_statements=256)
+    conn.executescript('''
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-20000;
+    ''')
+    return conn
+
 def init_database():
     """Initialize SQLite database with users and BMI records tables"""
-    with sqlite3.connect('bmi_data.db') as conn:
-        cursor = conn.cursor()
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        # Create BMI records table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bmi_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                weight REAL NOT NULL,
-                height REAL NOT NULL,
-                bmi REAL NOT NULL,
-                category TEXT NOT NULL,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        conn.commit()
+    cursor = get_conn().cursor()
+    # Create users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Create BMI records table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bmi_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            weight REAL NOT NULL,
+            height REAL NOT NULL,
+            bmi REAL NOT NULL,
+            category TEXT NOT NULL,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    # Index per-user history so it is read in order without a table scan;
+    # id breaks ties between records saved in the same second, and bmi and
+    # weight are included so statistics are answered from the index alone
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bmi_user_time_id_cov
+        ON bmi_records (user_id, recorded_at DESC, id DESC, bmi, weight)
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_bmi_user_time')
+    cursor.execute('DROP INDEX IF EXISTS idx_bmi_user_time_cov')
+
+def hash_password(password: str, salt: bytes = None) -> str:
+    """Hash password with scrypt and return salt + key as hex"""
+    if salt is None:
+        salt = os.urandom(16)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1)
+    return (salt + key).hex()
 
-def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a stored scrypt (or legacy SHA256) hash"""
+    if len(password_hash) == 64:
+        # Accounts created before the scrypt migration
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    else:
+        candidate = hash_password(password, bytes.fromhex(password_hash[:32]))
+    return hmac.compare_digest(candidate, password_hash)
+
+# Well-formed scrypt hash (zero salt) that no password matches
+_DUMMY_PASSWORD_HASH = '00' * 80
+
+@functools.lru_cache(maxsize=1024)
+def _user_row(username: str):
+    """Look up (id, password_hash) for a username"""
+    cursor = get_conn().cursor()
+    cursor.execute(SELECT_AUTH_SQL, (username,))
+    return cursor.fetchone()
 
 def create_user(username: str, password: str) -> bool:
     """Create a new user account"""
     try:
-        with sqlite3.connect('bmi_data.db') as conn:
-            cursor = conn.cursor()
-            password_hash = hash_password(password)
-            cursor.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)', 
-                          (username, password_hash))
-            conn.commit()
+        cursor = get_conn().cursor()
+        password_hash = hash_password(password)
+        cursor.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)', 
+                      (username, password_hash))
         return True
     except sqlite3.IntegrityError:
         return False
+    finally:
+        _user_row.cache_clear()
 
 def authenticate_user(username: str, password: str) -> int:
     """Authenticate user and return user ID if successful"""
-    with sqlite3.connect('bmi_data.db') as conn:
-        cursor = conn.cursor()
-        password_hash = hash_password(password)
-        cursor.execute('SELECT id FROM users WHERE username = ? AND password_hash = ?', 
-                      (username, password_hash))
-        result = cursor.fetchone()
-    return result[0] if result else None
+    result = _user_row(username)
+    if not result or len(result[1]) == 64:
+        # Spend one scrypt derivation for unknown and legacy accounts too, so
+        # response time does not reveal whether a username exists
+        verify_password(password, _DUMMY_PASSWORD_HASH)
+    if not result or not verify_password(password, result[1]):
+        return None
+    if len(result[1]) == 64:
+        # Upgrade legacy SHA256 hashes on successful login
+        cursor = get_conn().cursor()
+        cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?',
+                      (hash_password(password), result[0]))
+        _user_row.cache_clear()
+    return result[0]
 
 def calculate_bmi(weight: float, height: float) -> Tuple[float, str]:
     """Calculate BMI and return BMI value and category"""
     if height <= 0:
         return 0.0, "Invalid height"
     bmi = weight / (height ** 2)
-    if bmi < 18.5:
-        category = "Underweight"
-    elif 18.5 <= bmi < 25:
-        category = "Normal weight"
-    elif 25 <= bmi < 30:
-        category = "Overweight"
-    else:
-        category = "Obese"
-    return round(bmi, 2), category
+    # Branchless: each threshold passed moves one category up
+    code = int(bmi >= _UNDERWEIGHT_MAX) + int(bmi >= _NORMAL_MAX) + int(bmi >= _OVERWEIGHT_MAX)
+    return bmi, CATEGORIES[code]
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _calc_bmi_batch_jit(w, h, thresholds, out_bmi, out_cat):
+        for i in range(w.shape[0]):
+            b = w[i] / (h[i] * h[i])
+            out_bmi[i] = b
+            out_cat[i] = (b >= thresholds[0]) + (b >= thresholds[1]) + (b >= thresholds[2])
+
+def calculate_bmi_batch(weights, heights) -> Tuple[np.ndarray, np.ndarray]:
+    """Calculate BMI values and int8 category codes (indexes into CATEGORIES) for arrays"""
+    w = np.ascontiguousarray(weights, dtype=np.float64)
+    h = np.ascontiguousarray(heights, dtype=np.float64)
+    if (h <= 0).any():
+        raise ValueError("Height must be greater than zero.")
+    if njit is None:
+        bmi = w / (h * h)
+        codes = np.searchsorted(BMI_THRESHOLDS, bmi, side='right').astype(np.int8)
+        return bmi, codes
+    bmi = np.empty_like(w)
+    codes = np.empty(w.shape, dtype=np.int8)
+    _calc_bmi_batch_jit(w, h, BMI_THRESHOLDS, bmi, codes)
+    return bmi, codes
 
 def save_bmi_record(user_id: int, weight: float, height: float, bmi: float, category: str):
     """Save BMI record to database"""
-    with sqlite3.connect('bmi_data.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO bmi_records (user_id, weight, height, bmi, category)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, weight, height, bmi, category))
-        conn.commit()
+    cursor = get_conn().cursor()
+    cursor.execute(INSERT_RECORD_SQL, (user_id, weight, height, bmi, category))
+
+def save_bmi_records_bulk(user_id: int, rows: List[Tuple[float, float]]):
+    """Calculate and save many (weight, height) records in a single transaction"""
+    if not rows:
+        return
+    measurements = np.asarray(rows, dtype=np.float64)
+    if measurements.ndim != 2 or measurements.shape[1] != 2:
+        raise ValueError("Each row must be a (weight, height) pair.")
+    if not np.isfinite(measurements).all():
+        raise ValueError("Weight and height must be finite numbers.")
+    bmi, codes = calculate_bmi_batch(measurements[:, 0], measurements[:, 1])
+    params = [(user_id, weight, height, value, CATEGORIES[code])
+              for (weight, height), value, code
+              in zip(measurements.tolist(), bmi.tolist(), codes.tolist())]
+    # Own connection so the transaction never swallows other sessions' writes
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(INSERT_RECORD_SQL, params)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+def get_history_version(user_id: int) -> Tuple[int, int]:
+    """Return (record count, latest record id) for a user, read from the database"""
+    cursor = get_ro_conn().cursor()
+    cursor.execute(SELECT_HISTORY_VERSION_SQL, (user_id,))
+    return cursor.fetchone()
 
-def get_user_bmi_history(user_id: int) -> pd.DataFrame:
-    """Get BMI history for a specific user"""
-    with sqlite3.connect('bmi_data.db') as conn:
-        df = pd.read_sql_query('''
-            SELECT weight, height, bmi, category, recorded_at
-            FROM bmi_records
-            WHERE user_id = ?
-            ORDER BY recorded_at DESC
-        ''', conn, params=(user_id,))
+@st.cache_data(ttl=300)
+def _history_cached(user_id: int, version: Tuple[int, int], limit: int) -> pd.DataFrame:
+    """Load and parse BMI history; version changes whenever a record is saved"""
+    if cx is not None:
+        # Columnar fetch straight into pandas. connectorx opens its own
+        # connection and has no read-only URL form, so this path does not go
+        # through get_ro_conn; it does refuse anything but a single SELECT
+        query = CX_HISTORY_SQL_TEMPLATE.format(user_id=int(user_id), limit=int(limit))
+        df = cx.read_sql(f"sqlite://{os.path.abspath(DB_PATH)}", query, return_type='pandas')
+    else:
+        df = pd.read_sql_query(SELECT_HISTORY_SQL, get_ro_conn(), params=(user_id, limit))
     if not df.empty:
         df['recorded_at'] = pd.to_datetime(df['recorded_at'])
+        # Compact column layout: int8-coded categories and float32 measurements;
+        # bmi stays float64 so it rounds the same way as in the calculator
+        df['category'] = pd.Categorical(df['category'], categories=CATEGORIES)
+        df[['weight', 'height']] = df[['weight', 'height']].astype('float32')
     return df
 
-def get_bmi_statistics(df: pd.DataFrame) -> Dict:
-    """Calculate BMI statistics"""
-    if df.empty:
+def get_user_bmi_history(user_id: int, limit: int = None,
+                         version: Tuple[int, int] = None) -> pd.DataFrame:
+    """Get BMI history for a specific user, optionally only the most recent records"""
+    if version is None:
+        version = get_history_version(user_id)
+    # SQLite treats a negative LIMIT as no limit
+    return _history_cached(user_id, version, -1 if limit is None else limit)
+
+def history_to_csv(df: pd.DataFrame) -> bytes:
+    """Serialize BMI history to CSV"""
+    # BMI is stored unrounded; Python's round matches the calculator's :.2f
+    # display, while Series.round can land on the other side of a .xx5 tie
+    df = df.assign(bmi=[round(bmi, 2) for bmi in df['bmi'].tolist()])
+    return df.to_csv(index=False).encode()
+
+def get_bmi_statistics(user_id: int) -> Dict:
+    """Calculate BMI statistics in a single aggregate query"""
+    cursor = get_ro_conn().cursor()
+    cursor.execute('''
+        SELECT COUNT(*), AVG(bmi), MIN(bmi), MAX(bmi),
+            (SELECT bmi FROM bmi_records WHERE user_id = :uid
+             ORDER BY recorded_at DESC, id DESC LIMIT 1),
+            (SELECT bmi FROM bmi_records WHERE user_id = :uid
+             ORDER BY recorded_at ASC, id ASC LIMIT 1),
+            (SELECT weight FROM bmi_records WHERE user_id = :uid
+             ORDER BY recorded_at DESC, id DESC LIMIT 1),
+            (SELECT weight FROM bmi_records WHERE user_id = :uid
+             ORDER BY recorded_at ASC, id ASC LIMIT 1)
+        FROM bmi_records
+        WHERE user_id = :uid
+    ''', {'uid': user_id})
+    (total, average_bmi, min_bmi, max_bmi,
+     current_bmi, first_bmi, current_weight, first_weight) = cursor.fetchone()
+    if not total:
         return {}
     stats = {
-        'total_records': len(df),
-        'current_bmi': df.iloc[0]['bmi'],
-        'average_bmi': df['bmi'].mean(),
-        'min_bmi': df['bmi'].min(),
-        'max_bmi': df['bmi'].max(),
-        'weight_change': df.iloc[0]['weight'] - df.iloc[-1]['weight'] if len(df) > 1 else 0,
+        'total_records': total,
+        'current_bmi': current_bmi,
+        'average_bmi': average_bmi,
+        'min_bmi': min_bmi,
+        'max_bmi': max_bmi,
+        'weight_change': current_weight - first_weight,
         'bmi_trend': (
-            'Increasing' if len(df) > 1 and df.iloc[0]['bmi'] < df.iloc[-1]['bmi']
-            else 'Decreasing' if len(df) > 1 and df.iloc[0]['bmi'] > df.iloc[-1]['bmi']
+            'Increasing' if current_bmi < first_bmi
+            else 'Decreasing' if current_bmi > first_bmi
             else 'No trend'
         )
     }
     return stats
 
-def create_bmi_trend_chart(df: pd.DataFrame):
+@st.cache_data(ttl=300, max_entries=100)
+def create_bmi_trend_chart(user_id: int, version: Tuple[int, int], limit: int = None):
     """Create BMI trend chart using Plotly"""
+    import plotly.graph_objects as go
+    df = get_user_bmi_history(user_id, limit, version)
     if df.empty:
         return None
     fig = go.Figure()
@@ -133,9 +329,9 @@ def create_bmi_trend_chart(df: pd.DataFrame):
         line=dict(color='blue', width=2),
         marker=dict(size=8)
     ))
-    fig.add_hline(y=18.5, line_dash="dash", line_color="lightblue", annotation_text="Underweight")
-    fig.add_hline(y=25, line_dash="dash", line_color="green", annotation_text="Normal")
-    fig.add_hline(y=30, line_dash="dash", line_color="orange", annotation_text="Overweight")
+    for threshold, color, label in zip(BMI_THRESHOLDS.tolist(), ("lightblue", "green", "orange"),
+                                       ("Underweight", "Normal", "Overweight")):
+        fig.add_hline(y=threshold, line_dash="dash", line_color=color, annotation_text=label)
     fig.update_layout(
         title="BMI Trend Over Time",
         xaxis_title="Date",
@@ -145,8 +341,11 @@ def create_bmi_trend_chart(df: pd.DataFrame):
     )
     return fig
 
-def create_weight_trend_chart(df: pd.DataFrame):
+@st.cache_data(ttl=300, max_entries=100)
+def create_weight_trend_chart(user_id: int, version: Tuple[int, int], limit: int = None):
     """Create weight trend chart using Plotly"""
+    import plotly.express as px
+    df = get_user_bmi_history(user_id, limit, version)
     if df.empty:
         return None
     fig = px.line(df, x='recorded_at', y='weight', 
@@ -159,17 +358,51 @@ def create_weight_trend_chart(df: pd.DataFrame):
     )
     return fig
 
-def create_bmi_distribution_chart(df: pd.DataFrame):
-    """Create BMI category distribution chart"""
-    if df.empty:
+@st.cache_data(ttl=300, max_entries=100)
+def create_bmi_distribution_chart(user_id: int, version: Tuple[int, int]):
+    """Create BMI category distribution chart over the full history"""
+    import plotly.express as px
+    cursor = get_ro_conn().cursor()
+    cursor.execute(SELECT_CATEGORY_COUNTS_SQL, (user_id,))
+    counts = dict(cursor.fetchall())
+    if not counts:
         return None
-    category_counts = df['category'].value_counts()
-    fig = px.pie(values=category_counts.values, 
-                 names=category_counts.index,
+    category_counts = [counts.get(category, 0) for category in CATEGORIES]
+    fig = px.pie(values=category_counts, 
+                 names=CATEGORIES,
                  title='BMI Category Distribution')
     return fig
 
 # Streamlit App
+# BMI is stored unrounded; show it with two decimals
+HISTORY_COLUMN_CONFIG = {"bmi": st.column_config.NumberColumn(format="%.2f")}
+
+@st.fragment
+def _bmi_calc_fragment(user_id: int):
+    """Render the BMI calculator; widget changes rerun only this fragment"""
+    st.subheader("📊 BMI Calculator")
+    col1, col2 = st.columns(2)
+    with col1:
+        weight = st.number_input("Weight (kg)", min_value=1.0, max_value=300.0, 
+                               value=70.0, step=0.1)
+        height = st.number_input("Height (m)", min_value=0.5, max_value=3.0, 
+                               value=1.70, step=0.01)
+        if st.button("Calculate BMI"):
+            bmi, category = calculate_bmi(weight, height)
+            if category == "Invalid height":
+                st.error("Height must be greater than zero.")
+            else:
+                st.success(f"Your BMI is: **{bmi:.2f}**")
+                st.info(f"Category: **{category}**")
+                save_bmi_record(user_id, weight, height, bmi, category)
+                st.success("BMI record saved!")
+    with col2:
+        st.subheader("BMI Categories")
+        st.write("- **Underweight**: BMI < 18.5")
+        st.write("- **Normal weight**: 18.5 ≤ BMI < 25")
+        st.write("- **Overweight**: 25 ≤ BMI < 30")
+        st.write("- **Obese**: BMI ≥ 30")
+
 def main():
     st.set_page_config(
         page_title="BMI Calculator & Tracker",
@@ -228,34 +461,13 @@ def main():
         page = st.sidebar.selectbox("Navigate", 
                                    ["BMI Calculator", "Historical Data", "Trend Analysis", "Statistics"])
         if page == "BMI Calculator":
-            st.subheader("📊 BMI Calculator")
-            col1, col2 = st.columns(2)
-            with col1:
-                weight = st.number_input("Weight (kg)", min_value=1.0, max_value=300.0, 
-                                       value=70.0, step=0.1)
-                height = st.number_input("Height (m)", min_value=0.5, max_value=3.0, 
-                                       value=1.70, step=0.01)
-                if st.button("Calculate BMI"):
-                    bmi, category = calculate_bmi(weight, height)
-                    if category == "Invalid height":
-                        st.error("Height must be greater than zero.")
-                    else:
-                        st.success(f"Your BMI is: **{bmi}**")
-                        st.info(f"Category: **{category}**")
-                        save_bmi_record(st.session_state.user_id, weight, height, bmi, category)
-                        st.success("BMI record saved!")
-            with col2:
-                st.subheader("BMI Categories")
-                st.write("- **Underweight**: BMI < 18.5")
-                st.write("- **Normal weight**: 18.5 ≤ BMI < 25")
-                st.write("- **Overweight**: 25 ≤ BMI < 30")
-                st.write("- **Obese**: BMI ≥ 30")
+            _bmi_calc_fragment(st.session_state.user_id)
         elif page == "Historical Data":
             st.subheader("📈 Historical BMI Data")
             df = get_user_bmi_history(st.session_state.user_id)
             if not df.empty:
-                st.dataframe(df, use_container_width=True)
-                csv = df.to_csv(index=False)
+                st.dataframe(df, use_container_width=True, column_config=HISTORY_COLUMN_CONFIG)
+                csv = history_to_csv(df)
                 st.download_button(
                     label="Download CSV",
                     data=csv,
@@ -266,24 +478,25 @@ def main():
                 st.info("No BMI records found. Start by calculating your BMI!")
         elif page == "Trend Analysis":
             st.subheader("📊 BMI Trend Analysis")
-            df = get_user_bmi_history(st.session_state.user_id)
-            if not df.empty:
-                fig_bmi = create_bmi_trend_chart(df)
+            version = get_history_version(st.session_state.user_id)
+            if version[0]:
+                # A few hundred points is plenty for a line chart
+                fig_bmi = create_bmi_trend_chart(st.session_state.user_id, version, 500)
                 if fig_bmi:
                     st.plotly_chart(fig_bmi, use_container_width=True)
-                fig_weight = create_weight_trend_chart(df)
+                fig_weight = create_weight_trend_chart(st.session_state.user_id, version, 500)
                 if fig_weight:
                     st.plotly_chart(fig_weight, use_container_width=True)
-                fig_dist = create_bmi_distribution_chart(df)
+                fig_dist = create_bmi_distribution_chart(st.session_state.user_id, version)
                 if fig_dist:
                     st.plotly_chart(fig_dist, use_container_width=True)
             else:
                 st.info("No data available for trend analysis. Add some BMI records first!")
         elif page == "Statistics":
             st.subheader("📋 BMI Statistics")
-            df = get_user_bmi_history(st.session_state.user_id)
+            df = get_user_bmi_history(st.session_state.user_id, limit=5)
             if not df.empty:
-                stats = get_bmi_statistics(df)
+                stats = get_bmi_statistics(st.session_state.user_id)
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     st.metric("Total Records", stats['total_records'])
@@ -295,8 +508,7 @@ def main():
                     st.metric("Weight Change", f"{stats['weight_change']:.1f} kg")
                     st.metric("Trend", stats['bmi_trend'])
                 st.subheader("Recent Records")
-                recent_df = df.head(5)
-                st.dataframe(recent_df, use_container_width=True)
+                st.dataframe(df, use_container_width=True, column_config=HISTORY_COLUMN_CONFIG)
             else:
                 st.info("No statistics available. Start tracking your BMI!")
 